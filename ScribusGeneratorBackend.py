@@ -42,62 +42,30 @@ import xml.etree.ElementTree as ET
 import json
 import re
 import math
+import itertools
+import functools
+import collections
+from concurrent.futures import ThreadPoolExecutor
 
+from ScribusGeneratorConst import CONST
 
-class CONST:
-    # Constants for general usage
-    TRUE = 1
-    FALSE = 0
-    EMPTY = ""
 
-    APP_NAME = "Scribus Generator"
-    APP_VERSION = "4.2.0"
+@functools.lru_cache(maxsize=256)
+def compile_replacements(keys: tuple):
+    # Regular expression matching any of *keys*, compiled once for all the lines
+    # and data records substituted with the same keys.
+    return re.compile("|".join([re.escape(k) for k in keys]), re.M)
 
-    FORMAT_SLA = "Scribus"
-    FORMAT_JPG = "JPG"
-    FORMAT_PDF = "PDF"
-    FORMAT_ALL = "ALL"
 
-    IMG_QUALITY = 60
+@functools.lru_cache(maxsize=256)
+def compile_output_name(filename: str, keys: tuple):
+    # Split the output file name pattern once into literal text and %VAR_*% *keys*,
+    # so that naming each output file is a simple join.
+    # None when the name has to go through the full substitution (colors declaration).
+    if re.search(r"\s*<COLOR\s+", filename) != None:
+        return None
 
-    FILE_EXTENSION_SCRIBUS = "sla"
-    FILE_EXTENSION_JPG = "jpg"
-    FILE_EXTENSION_PDF = "pdf"
-
-    # In any case we use '/' as path separator on any platform
-    SEP_PATH = "/"
-    SEP_EXT = os.extsep
-
-    # CSV entry separator, comma by default; tab: " " is also common if using Excel.
-    CSV_SEP = ","
-    CSV_ENCODING = "utf-8"
-
-    # Indent the generated SLA code for more readability, aka "XML pretty print".
-    # Set to 1 if you want to edit generated SLA manually.
-    INDENT_SLA = 1
-    CONTRIB_TEXT = "\nPowered by ScribusGenerator - https://github.com/codfish-zz/ScribusGenerator/"
-
-    STORAGE_NAME = "ScribusGeneratorDefaultSettings"
-
-    # Set to 0 to prevent removal of un-subsituted variables, along with their empty containing itext
-    CLEAN_UNUSED_EMPTY_VARS = 1
-
-    # Set to 0 to keep the separating element before an unused/empty variable,
-    # typically a linefeed (<para>) or list syntax token (,;-.)
-    REMOVE_CLEANED_ELEMENT_PREFIX = 1
-
-    # Set to 0 to replace all tabs and linebreaks in csv data by simple spaces.
-    KEEP_TAB_LINEBREAK = 1
-
-    # Set to any word you'd like to use to trigger a jump to the next data record.
-    # Using a name similar to the variables %VAR_ ... % will ensure it is cleaned after generation,
-    # and not show in the final document(s).
-    NEXT_RECORD = "%SG_NEXT-RECORD%"
-    OUTPUTCOUNT_VAR = "COUNT"
-
-    # Set to the minimum amount of numbers you want to force in the output files name counter.
-    # 3 leads to 001,002,...; default is 1.
-    OUTPUTCOUNT_FILL = 1
+    return re.split("(%s)" % compile_replacements(keys).pattern, filename)
 
 
 class ScribusGenerator:
@@ -105,12 +73,18 @@ class ScribusGenerator:
     headers = []
 
     # The Generator Module has all the logic and will do all the work
-    def __init__(self, dataObject):
+    def __init__(self, dataObject, configureLogging=True):
+        # configureLogging is off when the caller already set up logging (eg. in worker processes)
         self.__dataObject = dataObject
 
-        logging.config.fileConfig(
-            os.path.join(os.path.abspath(os.path.dirname(__file__)), "logging.conf")
-        )
+        # Background writer of SLA files & their pending writes (asynchronous writes only)
+        self.__writer = None
+        self.__pending_writes = collections.deque()
+
+        if configureLogging:
+            logging.config.fileConfig(
+                os.path.join(os.path.abspath(os.path.dirname(__file__)), "logging.conf")
+            )
 
         # TODO: Check if logging works, if not warn user to configure log file path and disable.
         logging.info("ScribusGenerator initialized")
@@ -191,57 +165,30 @@ class ScribusGenerator:
 
         # Run core functions
         # Parse data file & store its contents
-        data = self.parse_data()
+        data, data_count = self.parse_data()
 
         # Generate SLA file(s) from template, using parsed data
-        output_filenames = self.generate_templates(root, data)
-
-        if self.__dataObject.getOutputFormat() == CONST.FORMAT_JPG:
-            # Export them to JPG
-            for output_name in output_filenames:
-                # Build absolute paths for ..
-                # (1) .. SLA file
-                sla_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_SCRIBUS,
-                )
-
-                # (2) .. JPG file
-                jpg_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_JPG,
-                )
+        if self.__dataObject.getAsyncWrite():
+            self.__writer = ThreadPoolExecutor(max_workers=CONST.ASYNC_WRITE_WORKERS)
 
-                img_quality = self.__dataObject.getImgQuality()
+        try:
+            output_filenames = self.generate_templates(root, data, data_count)
 
-                self.export_jpg(sla_output_file, jpg_output_file, img_quality)
-                logging.info("JPG file created: %s" % jpg_output_file)
+            # All SLA files must be on disk before exporting them
+            self.wait_for_writes()
 
-        elif self.__dataObject.getOutputFormat() == CONST.FORMAT_PDF:
-            # Export them to PDF
-            for output_name in output_filenames:
-                # Build absolute paths for ..
-                # (1) .. SLA file
-                sla_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_SCRIBUS,
-                )
-
-                # (2) .. PDF file
-                pdf_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_PDF,
-                )
+        finally:
+            if self.__writer is not None:
+                self.__writer.shutdown()
+                self.__writer = None
+                self.__pending_writes.clear()
 
-                self.export_pdf(sla_output_file, pdf_output_file)
-                logging.info("PDF file created: %s" % pdf_output_file)
+        # Export them to JPG and/or PDF, all formats of one file from a single opening in Scribus
+        output_format = self.__dataObject.getOutputFormat()
+        with_jpg = output_format in (CONST.FORMAT_JPG, CONST.FORMAT_ALL)
+        with_pdf = output_format in (CONST.FORMAT_PDF, CONST.FORMAT_ALL)
 
-        elif self.__dataObject.getOutputFormat() == CONST.FORMAT_ALL:
-            # Export them to All format
+        if with_jpg or with_pdf:
             for output_name in output_filenames:
                 # Build absolute paths for ..
                 # (1) .. SLA file
@@ -252,25 +199,30 @@ class ScribusGenerator:
                 )
 
                 # (2) .. JPG file
-                jpg_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_JPG,
-                )
+                jpg_output_file = None
+
+                if with_jpg:
+                    jpg_output_file = self.build_file_path(
+                        self.__dataObject.getOutputDirectory(),
+                        output_name,
+                        CONST.FILE_EXTENSION_JPG,
+                    )
 
                 # (3) .. PDF file
-                pdf_output_file = self.build_file_path(
-                    self.__dataObject.getOutputDirectory(),
-                    output_name,
-                    CONST.FILE_EXTENSION_PDF,
-                )
+                pdf_output_file = None
+
+                if with_pdf:
+                    pdf_output_file = self.build_file_path(
+                        self.__dataObject.getOutputDirectory(),
+                        output_name,
+                        CONST.FILE_EXTENSION_PDF,
+                    )
 
                 img_quality = self.__dataObject.getImgQuality()
 
-                self.export_jpg(sla_output_file, jpg_output_file, img_quality)
-                self.export_pdf(sla_output_file, pdf_output_file)
-                logging.info("JPG file created: %s" % jpg_output_file)
-                logging.info("PDF file created: %s" % pdf_output_file)
+                self.export_files(
+                    sla_output_file, jpg_output_file, pdf_output_file, img_quality
+                )
 
         # Remove them (if specified)
         if (not self.__dataObject.getOutputFormat() == CONST.FORMAT_SLA) and (
@@ -292,7 +244,8 @@ class ScribusGenerator:
     # Part I : PARSING DATA
 
     def parse_data(self):
-        # Parse data file
+        # Parse data file, return its data records and their number (None when not known yet).
+        # Streamed CSV records are returned as an iterator, the others as a list.
         data_file = self.__dataObject.getDataSourceFile()
 
         # (1) Check if data file exists
@@ -314,6 +267,26 @@ class ScribusGenerator:
             data = self.load_json(data_file)
 
         # (3) Load data
+        if extension == ".csv" and self.__dataObject.getStreamData():
+            # .. streamed from CSV file, read only up to the last item of the range
+            first_item, last_item = self.get_data_range(None)
+            data_count = None
+
+            # Output file names need the number of records, unless merged in a single file
+            if not self.__dataObject.getSingleOutput():
+                rows_count = self.count_csv_rows(data_file, last_item)
+
+                if last_item is None or last_item > rows_count:
+                    last_item = rows_count
+
+                data_count = max(last_item - first_item + 1, 0)
+
+            logging.debug(
+                "Data range of streamed rows is: %s - %s" % (first_item, last_item)
+            )
+
+            return self.stream_csv(data_file, first_item, last_item), data_count
+
         if extension == ".csv":
             # .. from CSV file
             data = self.load_csv(data_file)
@@ -326,53 +299,63 @@ class ScribusGenerator:
                     % (data_file)
                 )
 
-                return -1
+                return -1, 0
 
             # Determine data range
-            # (1) First item
-            first_item = 1
-            first_row = self.__dataObject.getFirstRow()
+            first_item, last_item = self.get_data_range(len(data))
 
-            if first_row != CONST.EMPTY:
-                try:
-                    new_first_item_value = int(first_row)
+            # Apply data range (if needed)
+            if first_item != 1 or last_item != len(data):
+                logging.debug("Custom data range is: %s - %s" % (first_item, last_item))
 
-                    # Guard against 0 or negative numbers
-                    first_item = max(new_first_item_value, 1)
+                data = data[first_item - 1 : last_item]
 
-                except:
-                    logging.warning(
-                        'Could not parse value of "first row" as an integer, '
-                        + "using default value instead."
-                    )
+            else:
+                logging.debug("Full data range will be used.")
 
-            # (2) Last item
-            last_item = len(data)
-            last_row = self.__dataObject.getLastRow()
+        return data, len(data)
 
-            if last_row != CONST.EMPTY:
-                try:
-                    new_last_item_value = int(last_row)
+    def get_data_range(self, data_count):
+        # Return first and last (1-based, inclusive) items of the data range set by the user,
+        # last item is None if neither set nor given by *data_count*.
+        # (1) First item
+        first_item = 1
+        first_row = self.__dataObject.getFirstRow()
 
-                    # Guard against numbers higher than the length of data
-                    last_item = min(new_last_item_value, last_item)
+        if first_row != CONST.EMPTY:
+            try:
+                new_first_item_value = int(first_row)
 
-                except:
-                    logging.warning(
-                        'Could not parse value of "last row" as an integer, '
-                        + "using default value instead."
-                    )
+                # Guard against 0 or negative numbers
+                first_item = max(new_first_item_value, 1)
 
-            # (3) Apply data range (if needed)
-            if first_item != 1 or last_item != len(data):
-                logging.debug("Custom data range is: %s - %s" % (first_item, last_item))
+            except:
+                logging.warning(
+                    'Could not parse value of "first row" as an integer, '
+                    + "using default value instead."
+                )
 
-                data = data[first_item - 1 : last_item]
+        # (2) Last item
+        last_item = data_count
+        last_row = self.__dataObject.getLastRow()
 
-            else:
-                logging.debug("Full data range will be used.")
+        if last_row != CONST.EMPTY:
+            try:
+                new_last_item_value = int(last_row)
+
+                # Guard against numbers higher than the length of data (when known)
+                if last_item is None:
+                    last_item = new_last_item_value
+                else:
+                    last_item = min(new_last_item_value, last_item)
 
-        return data
+            except:
+                logging.warning(
+                    'Could not parse value of "last row" as an integer, '
+                    + "using default value instead."
+                )
+
+        return first_item, last_item
 
     def load_json(self, json_file: str) -> list:
         try:
@@ -385,6 +368,19 @@ class ScribusGenerator:
         return []
 
     def load_csv(self, csv_file: str) -> list:
+        # Rows already parsed by the caller (eg. shared between templates) are used as is
+        preparsed_rows = self.__dataObject.getPreparsedRows()
+
+        if preparsed_rows is not None:
+            logging.debug("Using pre-parsed rows for data file %s" % (csv_file))
+
+            return preparsed_rows
+
+        return list(self.stream_csv(csv_file))
+
+    def stream_csv(self, csv_file: str, first_item=1, last_item=None):
+        # Yield the data records of the CSV file one by one, without loading the whole file,
+        # from *first_item* up to *last_item* (1-based, inclusive; None for the end of file).
         # Determine CSV options
         encoding = self.__dataObject.getCsvEncoding()
         delimiter = self.__dataObject.getCsvSeparator()
@@ -396,18 +392,68 @@ class ScribusGenerator:
                 file, delimiter=delimiter, skipinitialspace=True, doublequote=True
             )
 
+            # Skip records before the range as raw rows, without building their dictionary
+            skipped = 0
+
+            if first_item > 1 and reader.fieldnames is not None:
+                for row in reader.reader:
+                    # Empty lines are not counted, as DictReader skips them too
+                    if row:
+                        skipped += 1
+
+                    if skipped == first_item - 1:
+                        break
+
             # Filter empty lines
-            return [item for item in list(reader) if item]
+            index = first_item - 1
+
+            if last_item is not None and index >= last_item:
+                return
+
+            for item in reader:
+                if item:
+                    index += 1
+                    yield item
+
+                    # Stop reading the file at the end of the range
+                    if last_item is not None and index >= last_item:
+                        return
+
+    def count_csv_rows(self, csv_file: str, limit=None) -> int:
+        # Count the data records of the CSV file (header excluded), as read by stream_csv(),
+        # stopping at *limit* records if given.
+        with open(
+            csv_file, newline="", encoding=self.__dataObject.getCsvEncoding()
+        ) as file:
+            reader = csv.reader(
+                file,
+                delimiter=self.__dataObject.getCsvSeparator(),
+                skipinitialspace=True,
+                doublequote=True,
+            )
+
+            rows = (row for row in reader if row)
+
+            if limit is not None:
+                # Header line, then up to *limit* records
+                rows = itertools.islice(rows, limit + 1)
+
+            return max(sum(1 for row in rows) - 1, 0)
 
     # Part II : GENERATING TEMPLATE FILES
 
-    def generate_templates(self, root, data: list) -> list:
+    def generate_templates(self, root, data, data_count=None) -> list:
+        # *data* is a list or an iterator of data records, *data_count* their number if known.
+        # Records are consumed one after the other, so that streamed data is never fully loaded.
         # Define variables (for later use)
         merge_mode = self.__dataObject.getSingleOutput()
 
         # Check number of data records being consumed by Scribus source file
         # (1) Determine total of data records
-        data_count = len(data)
+        if data_count is None and not merge_mode:
+            # Needed up front to name each output file, as opposed to the single merged file
+            data = list(data)
+            data_count = len(data)
 
         # (2) Store number of data records in template document
         root_string = ET.tostring(
@@ -416,18 +462,31 @@ class ScribusGenerator:
         records_in_document = 1 + root_string.count(CONST.NEXT_RECORD)
 
         # (3) Inform about it
-        logging.info(
-            "Source document consumes %s data record(s) from %s."
-            % (records_in_document, data_count)
-        )
+        if data_count is None:
+            logging.info(
+                "Source document consumes %s data record(s) from streamed data."
+                % (records_in_document)
+            )
+        else:
+            logging.info(
+                "Source document consumes %s data record(s) from %s."
+                % (records_in_document, data_count)
+            )
 
         # Overwrite attributes from their /*/ItemAttribute[Parameter=SGAttribute] sibling, when applicable
         # Initialize template element & document properties
         template_element = self.overwrite_with_sg_attributes(root)
         pages_count = page_height = vertical_gap = groups_count = objects_count = 0
 
-        # Store keys of data items
-        self.headers = list(data[0].keys())
+        # Store keys of data items, from the first one
+        data = self.with_last_flag(data)
+        first_item = next(data, None)
+
+        if first_item is None:
+            raise IndexError("No data record found in data file")
+
+        self.headers = list(first_item[0].keys())
+        data = itertools.chain([first_item], data)
 
         logging.info("Variables from data file(s): %s" % self.headers)
 
@@ -440,7 +499,12 @@ class ScribusGenerator:
         buffer = []
         output = ""
 
-        for item in data:
+        # Template is only read during substitution: serialize it once for all records
+        template_lines = (
+            ET.tostring(template_element, method="xml").decode().split("\n")
+        )
+
+        for item, is_last in data:
             # each iteration substitutions 1 x the template, consuming required
             # data entries per active options.
             #
@@ -455,7 +519,7 @@ class ScribusGenerator:
             # Check if ..
             # (1) .. done buffering data for current document OR
             # (2) .. last data record
-            if index_current % records_in_document == 0 or index_current == data_count:
+            if index_current % records_in_document == 0 or is_last:
                 logging.debug(
                     "Substituting buffer, with index_current being %s and index_first_of_batch %s"
                     % (index_current, index_first_of_batch)
@@ -465,7 +529,7 @@ class ScribusGenerator:
                 output = self.substitute_data(
                     self.headers,
                     self.encode_scribus_xml(buffer),
-                    ET.tostring(template_element, method="xml").decode().split("\n"),
+                    template_lines,
                     CONST.KEEP_TAB_LINEBREAK,
                     index_first_of_batch=index_first_of_batch,
                 )
@@ -473,7 +537,7 @@ class ScribusGenerator:
                 # Check if merge-mode is selected ..
                 if merge_mode:
                     # Update DOCUMENT properties on first substitution
-                    if index_current == min(records_in_document, data_count):
+                    if index_first_of_batch == 1:
                         logging.debug(
                             "Generating reference content from buffer at #%s"
                             % index_current
@@ -493,15 +557,6 @@ class ScribusGenerator:
                             "Current template has #%s page objects" % objects_count
                         )
 
-                        document_element.set(
-                            "ANZPAGES",
-                            str(
-                                math.ceil(
-                                    pages_count * data_count // records_in_document
-                                )
-                            ),
-                        )
-
                         document_element.set(
                             "DOCCONTRIB",
                             document_element.get("DOCCONTRIB") + CONST.CONTRIB_TEXT,
@@ -548,6 +603,14 @@ class ScribusGenerator:
 
         # Clean & write single SLA file (merge-mode only)
         if merge_mode:
+            # Total of data records is known once all of them are consumed
+            data_count = index_current - 1
+
+            document_element.set(
+                "ANZPAGES",
+                str(math.ceil(pages_count * data_count // records_in_document)),
+            )
+
             var_names_dic = dict(list(zip(self.headers, self.headers)))
             # logging.debug('writing merged file with dic %s' % var_names_dic)
             output_file = self.create_output_file(
@@ -562,6 +625,21 @@ class ScribusGenerator:
 
         return output_files
 
+    def with_last_flag(self, data):
+        # Yield (item, is_last) for each item of *data*, looking one item ahead
+        iterator = iter(data)
+
+        for item in iterator:
+            break
+        else:
+            return
+
+        for next_item in iterator:
+            yield item, False
+            item = next_item
+
+        yield item, True
+
     def overwrite_with_sg_attributes(self, root):
         # modifies root such that
         # attributes have been rewritten from their /*/ItemAttribute[Parameter=SGAttribute] sibling, when applicable.
@@ -621,9 +699,7 @@ class ScribusGenerator:
     def multiple_replace(self, string: str, replacements: dict) -> str:
         # multiple simultaneous string replacements, per http://stackoverflow.com/a/15448887/1694411)
         # combine with dictionary = dict(zip(keys, values)) to use on arrays
-        pattern = re.compile(
-            "|".join([re.escape(k) for k in replacements.keys()]), re.M
-        )
+        pattern = compile_replacements(tuple(replacements.keys()))
 
         return pattern.sub(lambda x: replacements[x.group(0)], str(string))
 
@@ -658,7 +734,7 @@ class ScribusGenerator:
         # attribute-value-based substring-search in ElementTree
         # but that makes NEXT-RECORD token position in XML critical.
 
-        result = ""
+        result = []
         index = 0
         replacements_outdated = 1
 
@@ -669,7 +745,7 @@ class ScribusGenerator:
                 re.search("%VAR_|" + CONST.NEXT_RECORD, line) == None
                 or re.search("\s*<COLOR\s+", line) != None
             ):
-                result = result + line
+                result.append(line)
                 # logging.debug("  keeping intact %s"%line[:30])
                 continue
 
@@ -703,22 +779,7 @@ class ScribusGenerator:
 
             # Remove (& trim) any (unused) %VAR_\w*% like string
             if clean:
-                # TODO: is there a way to input warning
-                # "data not found for variable named XX"
-                # instead of the number
-                if CONST.REMOVE_CLEANED_ELEMENT_PREFIX:
-                    (line, count) = re.subn("\s*[,;-]*\s*%VAR_\w*%\s*", "", line)
-
-                # TODO: is there a way to input warning
-                # "data not found for variable named XX"
-                # instead of the number
-                else:
-                    (line, count) = re.subn("\s*%VAR_\w*%\s*", "", line)
-
-                if count > 0:
-                    logging.debug("cleaned %d empty variable(s)" % count)
-
-                (line, count) = re.subn("\s*%s\w*\s*" % CONST.NEXT_RECORD, "", line)
+                line = self.clean_unused_vars(line)
 
             # convert \t and \n into scribus <tab/> and <linebreak/>
             if keep_tabs_lf == 1 and re.search("[\t\n]+", line, flags=re.MULTILINE):
@@ -752,9 +813,30 @@ class ScribusGenerator:
                         + "kindly report this to the developers: %s" % line
                     )
 
-            result = result + line
+            result.append(line)
 
-        return result
+        return "".join(result)
+
+    def clean_unused_vars(self, line: str) -> str:
+        # Remove (& trim) any (unused) %VAR_\w*% like string and NEXT_RECORD token from *line*
+        # TODO: is there a way to input warning
+        # "data not found for variable named XX"
+        # instead of the number
+        if CONST.REMOVE_CLEANED_ELEMENT_PREFIX:
+            (line, count) = re.subn("\s*[,;-]*\s*%VAR_\w*%\s*", "", line)
+
+        # TODO: is there a way to input warning
+        # "data not found for variable named XX"
+        # instead of the number
+        else:
+            (line, count) = re.subn("\s*%VAR_\w*%\s*", "", line)
+
+        if count > 0:
+            logging.debug("cleaned %d empty variable(s)" % count)
+
+        (line, count) = re.subn("\s*%s\w*\s*" % CONST.NEXT_RECORD, "", line)
+
+        return line
 
     def shift_pages_and_objects(
         self,
@@ -888,16 +970,45 @@ class ScribusGenerator:
                 ord("*"): "_",
             }
 
-            list_vars = list(dico.keys())
-            list_vars.append(CONST.OUTPUTCOUNT_VAR)
-            list_values = list(dico.values())
-            list_values.append(result)
             logging.debug(
                 "computing output file name from %s (count is %s)" % (filename, result)
             )
-            result = self.substitute_data(
-                list_vars, [list_values], [filename], index_first_of_batch=index
+
+            # Same replacements as substitute_data() would use on the file name,
+            # missing values (short CSV rows) being substituted by empty text as re.sub() does
+            replacements = dict(
+                zip(
+                    ["%VAR_" + n + "%" for n in dico.keys()],
+                    ["" if v is None else v for v in dico.values()],
+                )
             )
+            replacements["%VAR_" + CONST.OUTPUTCOUNT_VAR + "%"] = str(index)
+
+            segments = compile_output_name(filename, tuple(replacements.keys()))
+
+            if segments is None:
+                list_vars = list(dico.keys())
+                list_vars.append(CONST.OUTPUTCOUNT_VAR)
+                list_values = list(dico.values())
+                list_values.append(result)
+                result = self.substitute_data(
+                    list_vars, [list_values], [filename], index_first_of_batch=index
+                )
+
+            else:
+                # Literal text at even positions, variables at odd ones
+                result = "".join(
+                    [
+                        segment if position % 2 == 0 else replacements[segment]
+                        for position, segment in enumerate(segments)
+                    ]
+                )
+
+                # Cleaning only changes text still containing variable-like strings
+                if CONST.CLEAN_UNUSED_EMPTY_VARS and (
+                    "%VAR_" in result or CONST.NEXT_RECORD in result
+                ):
+                    result = self.clean_unused_vars(result)
 
             # TODO: check for utf8 characters support in windows filesystem
             result = result.translate(table)
@@ -936,16 +1047,49 @@ class ScribusGenerator:
                 ET.tostring(output_tree.getroot())
             ).toprettyxml(indent="   ")
 
-            with open(sla_file, "w", encoding="utf-8") as file:
-                file.write(xml_string)
+            if self.__writer is None:
+                self.write_file(sla_file, xml_string)
+            else:
+                self.submit_write(sla_file, xml_string)
 
-        else:
+        elif self.__writer is None:
             output_tree.write(sla_file, encoding="utf-8")
+            logging.info("Scribus file created: %s" % sla_file)
 
-        logging.info("Scribus file created: %s" % sla_file)
+        else:
+            self.submit_write(
+                sla_file, ET.tostring(output_tree.getroot(), encoding="utf-8")
+            )
 
         return sla_file
 
+    def write_file(self, file_path: str, content):
+        # Write (text or bytes) *content* to the file
+        if isinstance(content, bytes):
+            with open(file_path, "wb") as file:
+                file.write(content)
+
+        else:
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write(content)
+
+        logging.info("Scribus file created: %s" % file_path)
+
+    def submit_write(self, file_path: str, content):
+        # Write the file in the background while the next one is generated,
+        # waiting for the oldest writes when too many are pending to bound memory usage.
+        while len(self.__pending_writes) >= CONST.ASYNC_WRITE_PENDING:
+            self.__pending_writes.popleft().result()
+
+        self.__pending_writes.append(
+            self.__writer.submit(self.write_file, file_path, content)
+        )
+
+    def wait_for_writes(self):
+        # Wait for all background writes, raising the error of any failed one
+        while self.__pending_writes:
+            self.__pending_writes.popleft().result()
+
     def remove_empty_texts(self, root):
         # *modifies* root `ElementTree` by removing empty text elements and their empty placeholders.
         # returns number of ITEXT elements deleted.
@@ -996,48 +1140,33 @@ class ScribusGenerator:
     # Part III : JPG/PDF EXPORT & CLEANUP
 
     def export_jpg(self, sla_file: str, jpg_file: str, img_quality: int):
-        import scribus
-
-        # Create filepath (if needed)
-        directory = os.path.dirname(jpg_file)
-
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-
-        # Export JPG using Scribus API
-        # (1) Open template file
-        scribus.openDoc(sla_file)
-
-        # (2) Determine pages
-        i = 0
-        pages_count = []
-
-        while i < scribus.pageCount():
-            i += 1
-            pages_count.append(i)
-
-        # (3) Setup JPG exporter
-        exporter = scribus.ImageExport()
-        exporter.type = CONST.FORMAT_JPG
-        exporter.name = str(jpg_file)
-        exporter.quality = img_quality
-
-        # (4) Save JPG file
-        exporter.save()
-
-        # (5) Close document
-        scribus.closeDoc()
+        self.export_files(sla_file, jpg_file, None, img_quality)
 
     def export_pdf(self, sla_file: str, pdf_file: str):
+        self.export_files(sla_file, None, pdf_file)
+
+    def export_files(
+        self,
+        sla_file: str,
+        jpg_file: str = None,
+        pdf_file: str = None,
+        img_quality: int = CONST.IMG_QUALITY,
+    ):
+        # Export the SLA file to JPG and/or PDF (when their path is given),
+        # opening it only once in Scribus for all formats.
         import scribus
 
         # Create filepath (if needed)
-        directory = os.path.dirname(pdf_file)
+        for export_file in (jpg_file, pdf_file):
+            if export_file is None:
+                continue
 
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+            directory = os.path.dirname(export_file)
+
+            if not os.path.exists(directory):
+                os.makedirs(directory)
 
-        # Export PDF using Scribus API
+        # Export using Scribus API
         # (1) Open template file
         scribus.openDoc(sla_file)
 
@@ -1049,14 +1178,27 @@ class ScribusGenerator:
             i += 1
             pages_count.append(i)
 
-        # (3) Setup PDF exporter
-        pdf_exporter = scribus.PDFfile()
-        pdf_exporter.info = CONST.APP_NAME
-        pdf_exporter.file = str(pdf_file)
-        pdf_exporter.pages = pages_count
+        if jpg_file is not None:
+            # (3) Setup JPG exporter
+            exporter = scribus.ImageExport()
+            exporter.type = CONST.FORMAT_JPG
+            exporter.name = str(jpg_file)
+            exporter.quality = img_quality
 
-        # (4) Save PDF file
-        pdf_exporter.save()
+            # (4) Save JPG file
+            exporter.save()
+            logging.info("JPG file created: %s" % jpg_file)
+
+        if pdf_file is not None:
+            # (3) Setup PDF exporter
+            pdf_exporter = scribus.PDFfile()
+            pdf_exporter.info = CONST.APP_NAME
+            pdf_exporter.file = str(pdf_file)
+            pdf_exporter.pages = pages_count
+
+            # (4) Save PDF file
+            pdf_exporter.save()
+            logging.info("PDF file created: %s" % pdf_file)
 
         # (5) Close document
         scribus.closeDoc()
@@ -1120,6 +1262,7 @@ class GeneratorDataObject:
         lastRow=CONST.EMPTY,
         saveSettings=CONST.TRUE,
         closeDialog=CONST.FALSE,
+        asyncWrite=CONST.FALSE,
     ):
         self.__scribusSourceFile = scribusSourceFile
         self.__dataSourceFile = dataSourceFile
@@ -1135,6 +1278,11 @@ class GeneratorDataObject:
         self.__lastRow = lastRow
         self.__saveSettings = saveSettings
         self.__closeDialog = closeDialog
+        self.__asyncWrite = asyncWrite
+        # Not user settings: rows parsed once from the data file, reused instead of reading it again,
+        # or whether the CSV data file is to be streamed by the generator instead of loaded
+        self.__preparsedRows = None
+        self.__streamData = CONST.FALSE
 
     # Getters
     def getScribusSourceFile(self):
@@ -1179,6 +1327,15 @@ class GeneratorDataObject:
     def getCloseDialog(self):
         return self.__closeDialog
 
+    def getAsyncWrite(self):
+        return self.__asyncWrite
+
+    def getPreparsedRows(self):
+        return self.__preparsedRows
+
+    def getStreamData(self):
+        return self.__streamData
+
     # Setters
     def setScribusSourceFile(self, fileName):
         self.__scribusSourceFile = fileName
@@ -1222,7 +1379,16 @@ class GeneratorDataObject:
     def setCloseDialog(self, value):
         self.__closeDialog = value
 
-    # (de)Serialize all options but scribusSourceFile and saveSettings
+    def setAsyncWrite(self, value):
+        self.__asyncWrite = value
+
+    def setPreparsedRows(self, rows):
+        self.__preparsedRows = rows
+
+    def setStreamData(self, value):
+        self.__streamData = value
+
+    # (de)Serialize all options but scribusSourceFile, saveSettings and asyncWrite
     def toString(self):
         return json.dumps(
             {
@@ -1239,6 +1405,7 @@ class GeneratorDataObject:
                 "to": self.__lastRow,
                 "close": self.__closeDialog,
                 # 'savesettings':self.__saveSettings NOT saved
+                # 'asyncwrite':self.__asyncWrite NOT saved
             },
             sort_keys=True,
         )
@@ -1266,6 +1433,7 @@ class GeneratorDataObject:
         self.__lastRow = j["to"]
         self.__closeDialog = j["close"]
         # self.__saveSettings NOT loaded
+        # self.__asyncWrite NOT loaded
 
         logging.debug("loaded %d user settings" % (len(j)))
 
@@ -36,9 +36,14 @@ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLI
 """
 
 import argparse
+import glob
 import os
-import traceback
-from ScribusGeneratorBackend import CONST, ScribusGenerator, GeneratorDataObject
+import stat
+from collections import Counter
+
+# Only the constants are needed to build the parser: the Engine, logging and the process pool
+# are imported once arguments are parsed, so that --help or invalid arguments do not pay for them.
+from ScribusGeneratorConst import CONST
 
 
 parser = argparse.ArgumentParser(
@@ -81,6 +86,9 @@ Examples:
 %(prog)s sample.sla --dataFile data.csv --outName result --formatAll
     Generates all type of result files for sample.sla using all rows of the data.csv.
 
+%(prog)s sample.sla --dataFile data.csv --outName result --formatJpg --formatPdf
+    Same as --formatAll: formats can be combined, each generated file is opened only once to export them.
+
 More information: https://github.com/codfish-zz/ScribusGenerator/
 """,
 )
@@ -138,7 +146,7 @@ parser.add_argument(
     help="""Name of the generated files, with no extension. 
     Default is a simple incremental index. 
     Using SG variables is allowed to define the name of generated documents. 
-    Use %VAR_COUNT% as a unique counter defined automatically from the data entry position.""",
+    Use %%VAR_COUNT%% as a unique counter defined automatically from the data entry position.""",
 )
 
 parser.add_argument(
@@ -204,6 +212,55 @@ parser.add_argument(
     help="Generate result file in PDF format.",
 )
 
+parser.add_argument(
+    "-a",
+    "--asyncIO",
+    action="store_true",
+    default=False,
+    help="Write generated Scribus files in the background while the next ones are generated.",
+)
+
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="""Number of templates generated in parallel (SLA format with --single only,
+    when each template writes a file of its own name).
+    Default is the number of CPUs, use 1 to process templates one after the other.""",
+)
+
+
+# Status of each template generation, reported back by process_template()
+STATUS_DONE = "done"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+# Parsed CSV rows, shared by all templates processed in the same process.
+# Keyed by (absolute path, modification time, delimiter, encoding) so a modified file is parsed again.
+csvCache = {}
+
+# Signatures of the errors already reported by this process, see process_template()
+reportedErrors = set()
+
+
+def init_worker(logQueue, sharedRows):
+    """Set up a worker process of the pool: log through the main process only,
+    as several processes cannot share (and rotate) the same log file,
+    and start from the CSV rows already parsed by the main process (see csvCache)."""
+    import logging
+    import logging.handlers
+
+    csvCache.update(sharedRows)
+
+    root = logging.getLogger()
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    root.addHandler(logging.handlers.QueueHandler(logQueue))
+    root.setLevel(logging.DEBUG)
+
 
 def ife(condition, if_result, else_result):
     """Utility if-then-else syntactic sugar"""
@@ -213,6 +270,162 @@ def ife(condition, if_result, else_result):
     return else_result
 
 
+def stat_data_file(fileName):
+    """Return the os.stat() result of a regular file, None if it is missing or not a file"""
+    # A single stat() tells both existence and file type
+    try:
+        fileStat = os.stat(fileName)
+
+    except OSError:
+        return None
+
+    return ife(stat.S_ISREG(fileStat.st_mode), fileStat, None)
+
+
+def csv_cache_key(dataFile, fileStat, separator, encoding):
+    """Return the csvCache key of a data file parsed with the given delimiter and encoding"""
+    return (os.path.abspath(dataFile), fileStat.st_mtime_ns, separator, encoding)
+
+
+def process_template(
+    infile,
+    settings,
+    load,
+    outName,
+    multipleTemplates,
+    dataFileStat=None,
+    streamData=False,
+):
+    """Generate the output files for one template, return (infile, status, message)
+    message of a failure is (error signature, details), details being None when already
+    returned for the same signature by this process.
+    dataFileStat is the stat of the data file when already known by the caller,
+    streamData tells the CSV data file is used by this template only."""
+    from ScribusGeneratorBackend import ScribusGenerator, GeneratorDataObject
+
+    # Fresh settings & generator for each template, so it can run in a worker process
+    dataObject = GeneratorDataObject(**settings)
+    dataObject.setScribusSourceFile(infile)
+
+    head, tail = os.path.split(infile)
+    base = os.path.splitext(infile)[0]
+
+    # Logging is set up once by main(), or by init_worker() in worker processes
+    generator = ScribusGenerator(dataObject, configureLogging=False)
+    log = generator.get_log()
+
+    if load:
+        saved = generator.get_saved_settings()
+
+        if saved:
+            dataObject.loadFromString(saved)
+            log.info("Settings loaded from %s:" % (tail))
+
+        else:
+            log.warning(
+                "Could not load settings from %s. using arguments and defaults instead"
+                % (tail)
+            )
+
+    if dataObject.getDataSourceFile() is CONST.EMPTY:
+        # Default data file is <template-sla>.csv
+        dataObject.setDataSourceFile(base + ".csv")
+
+    dataFile = dataObject.getDataSourceFile()
+
+    if dataFileStat is None or load:
+        dataFileStat = stat_data_file(dataFile)
+
+    if dataFileStat is None:
+        return (
+            infile,
+            STATUS_SKIPPED,
+            "Data file [%s] for [%s] not found, skip this template."
+            % (dataFile, tail),
+        )
+
+    # Default outDir is template dir
+    if dataObject.getOutputDirectory() is CONST.EMPTY:
+        dataObject.setOutputDirectory(head)
+
+        if not os.path.exists(dataObject.getOutputDirectory()):
+            log.info(
+                "Creating output directory: %s" % (dataObject.getOutputDirectory())
+            )
+            os.makedirs(dataObject.getOutputDirectory(), exist_ok=True)
+
+    if dataObject.getSingleOutput() and multipleTemplates:
+        dataObject.setOutputFileName(outName + "__" + tail)
+
+    log.info(
+        "Generating all files for %s in directory %s"
+        % (tail, dataObject.getOutputDirectory())
+    )
+
+    try:
+        # Data is read in here, so that a bad data file only fails this template
+        if os.path.splitext(dataFile)[1] == ".csv" and streamData:
+            # Stream the rows of a data file no other template uses, rather than loading it.
+            # Only the rows up to --lastrow are read, those before --firstrow are skipped unparsed.
+            dataObject.setStreamData(CONST.TRUE)
+
+        # Parse each CSV data file only once, whatever the number of templates using it
+        elif os.path.splitext(dataFile)[1] == ".csv":
+            key = csv_cache_key(
+                dataFile,
+                dataFileStat,
+                dataObject.getCsvSeparator(),
+                dataObject.getCsvEncoding(),
+            )
+
+            if key not in csvCache:
+                csvCache[key] = generator.load_csv(dataFile)
+
+            dataObject.setPreparsedRows(csvCache[key])
+
+        generator.run()
+        return (infile, STATUS_DONE, "Scribus Generation completed. Congrats!")
+    except Exception as e:
+        # Same failures are reported once: signature is the exception type and the line raising it
+        lastFrame = e.__traceback__
+
+        while lastFrame.tb_next is not None:
+            lastFrame = lastFrame.tb_next
+
+        signature = (
+            type(e).__name__,
+            lastFrame.tb_frame.f_code.co_filename,
+            lastFrame.tb_lineno,
+        )
+
+        # Error details already formatted by this process are not formatted again
+        if signature in reportedErrors:
+            return (infile, STATUS_FAILED, (signature, None))
+
+        reportedErrors.add(signature)
+
+        if isinstance(e, ValueError):
+            message = (
+                "\nError: Could not replace variable with value, please check your data file. Details: %s\n\n"
+                % e
+            )
+        elif isinstance(e, IndexError):
+            message = (
+                "\nError: Could not find the value for variable, please check your data file. Details: %s\n\n"
+                % e
+            )
+        else:
+            message = "\nError: %s" % e
+
+        import traceback
+
+        return (
+            infile,
+            STATUS_FAILED,
+            (signature, message + "\n" + traceback.format_exc()),
+        )
+
+
 def main():
     # Defaults
     outDir = os.getcwd()
@@ -220,20 +433,30 @@ def main():
 
     args = parser.parse_args()
 
+    import logging
+    import logging.handlers
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from ScribusGeneratorBackend import ScribusGenerator, GeneratorDataObject
+
     # Create outDir if needed
     if args.outDir is not None:
         outDir = args.outDir
         os.makedirs(outDir, exist_ok=True)
 
-    if args.formatJpg:
+    # Formats can be combined, SLA files are always generated anyway
+    withJpg = args.formatJpg or args.formatAll
+    withPdf = args.formatPdf or args.formatAll
+
+    if withJpg and withPdf:
+        format = CONST.FORMAT_ALL
+    elif withJpg:
         format = CONST.FORMAT_JPG
-    elif args.formatPdf:
+    elif withPdf:
         format = CONST.FORMAT_PDF
-    elif args.formatAll:
-        format = CONST.FORMAT_ALL
 
-    # Collect the settings
-    dataObject = GeneratorDataObject(
+    # Collect the settings, each template gets its own GeneratorDataObject built from them
+    settings = dict(
         dataSourceFile=ife(not (args.dataFile is None), args.dataFile, CONST.EMPTY),
         outputDirectory=outDir,
         outputFileName=args.outName,
@@ -246,82 +469,153 @@ def main():
         firstRow=args.firstRow,
         lastRow=args.lastRow,
         saveSettings=args.save,
+        asyncWrite=args.asyncIO,
     )
 
-    generator = ScribusGenerator(dataObject)
-
+    generator = ScribusGenerator(GeneratorDataObject(**settings))
     log = generator.get_log()
+    # Expand wildcards the shell did not (eg. on Windows or when quoted), keeping the given order.
+    # Existing paths are kept as is, even when their name looks like a pattern (eg. "card[1].sla").
+    infiles = list(
+        dict.fromkeys(
+            path
+            for pattern in args.infiles
+            for path in ife(
+                glob.has_magic(pattern) and not os.path.exists(pattern),
+                sorted(glob.glob(pattern)) or [pattern],
+                [pattern],
+            )
+        )
+    )
+
     log.debug(
         "ScribusGenerator is starting generation for %s template(s)."
-        % (str(len(args.infiles)))
+        % (str(len(infiles)))
     )
 
-    for infile in args.infiles:
-        dataObject.setScribusSourceFile(infile)
-
-        if args.load:
-            saved = generator.get_saved_settings()
-
-            if saved:
-                dataObject.loadFromString(saved)
-                log.info("Settings loaded from %s:" % (os.path.split(infile)[1]))
-
-            else:
-                log.warning(
-                    "Could not load settings from %s. using arguments and defaults instead"
-                    % (os.path.split(infile)[1])
-                )
-
-        if dataObject.getDataSourceFile() is CONST.EMPTY:
-            # Default data file is <template-sla>.csv
-            dataObject.setDataSourceFile(os.path.splitext(infile)[0] + ".csv")
-
-        if not (
-            os.path.exists(dataObject.getDataSourceFile())
-            and os.path.isfile(dataObject.getDataSourceFile())
-        ):
+    # Check all data files up front, concurrently as stat() mostly waits on the filesystem.
+    # Saved settings may point to another data file, so it is only known here when not loading them.
+    if args.load:
+        dataFileStats = [None] * len(infiles)
+    else:
+        dataFiles = [
+            ife(args.dataFile is None, os.path.splitext(infile)[0] + ".csv", args.dataFile)
+            for infile in infiles
+        ]
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            dataFileStats = list(executor.map(stat_data_file, dataFiles))
+
+    # Data files used by a single template are streamed, the others parsed once and shared
+    if args.load:
+        dataFileUses = {}
+    else:
+        dataFileUses = Counter(os.path.abspath(dataFile) for dataFile in dataFiles)
+
+    tasks = []
+
+    for position, (infile, dataFileStat) in enumerate(zip(infiles, dataFileStats)):
+        if dataFileStat is None and not args.load:
             log.warning(
                 "Data file [%s] for [%s] not found, skip this template."
-                % (dataObject.getDataSourceFile(), os.path.split(infile)[1])
+                % (dataFiles[position], os.path.split(infile)[1])
             )
             continue
 
-        # Default outDir is template dir
-        if dataObject.getOutputDirectory() is CONST.EMPTY:
-            dataObject.setOutputDirectory(os.path.split(infile)[0])
+        streamData = (
+            not args.load and dataFileUses[os.path.abspath(dataFiles[position])] == 1
+        )
+
+        tasks.append(
+            (
+                infile,
+                settings,
+                args.load,
+                args.outName,
+                len(infiles) > 1,
+                dataFileStat,
+                streamData,
+            )
+        )
+
+    # PDF/JPG export drives the embedding Scribus instance, which cannot be shared
+    # between processes: only pure SLA generation is dispatched to a process pool.
+    # Settings loaded from each template may ask for another format, so they stay serial.
+    # All templates write to outDir: only merged files, named after each template, cannot
+    # collide, other names (eg. the default 1.sla, 2.sla, ...) may be written by several templates.
+    distinctOutputs = args.merge and len(
+        set(os.path.split(task[0])[1] for task in tasks)
+    ) == len(tasks)
+
+    if (
+        len(tasks) > 1
+        and args.jobs > 1
+        and format == CONST.FORMAT_SLA
+        and not args.load
+        and distinctOutputs
+    ):
+        # Parse data files shared by several templates here, once for all workers.
+        # Failing ones are left to each template, to be reported as generation errors.
+        for dataFile, dataFileStat in zip(dataFiles, dataFileStats):
+            if (
+                dataFileStat is None
+                or os.path.splitext(dataFile)[1] != ".csv"
+                or dataFileUses[os.path.abspath(dataFile)] < 2
+            ):
+                continue
+
+            key = csv_cache_key(
+                dataFile, dataFileStat, args.csvDelimiter, args.csvEncoding
+            )
 
-            if not os.path.exists(dataObject.getOutputDirectory()):
-                log.info(
-                    "Creating output directory: %s" % (dataObject.getOutputDirectory())
-                )
-                os.makedirs(dataObject.getOutputDirectory())
+            if key in csvCache:
+                continue
 
-        if dataObject.getSingleOutput() and (len(args.infiles) > 1):
-            dataObject.setOutputFileName(args.outName + "__" + os.path.split(infile)[1])
+            try:
+                csvCache[key] = generator.load_csv(dataFile)
+            except Exception as e:
+                log.debug("Could not parse shared data file %s: %s" % (dataFile, e))
 
-        log.info(
-            "Generating all files for %s in directory %s"
-            % (os.path.split(infile)[1], dataObject.getOutputDirectory())
+        # Log records of the workers are handled by the main process handlers
+        logQueue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(
+            logQueue, *logging.getLogger().handlers, respect_handler_level=True
         )
+        listener.start()
 
         try:
-            generator.run()
-            log.info("Scribus Generation completed. Congrats!")
-        except ValueError as e:
-            log.error(
-                "\nError: Could not replace variable with value, please check your data file. Details: %s\n\n"
-                % e
-            )
-            traceback.print_exc()
-        except IndexError as e:
-            log.error(
-                "\nError: Could not find the value for variable, please check your data file. Details: %s\n\n"
-                % e
-            )
-            traceback.print_exc
-        except Exception:
-            log.error("\nError: " + traceback.format_exc())
-            traceback.print_exc
+            with ProcessPoolExecutor(
+                max_workers=min(args.jobs, len(tasks)),
+                initializer=init_worker,
+                initargs=(logQueue, csvCache),
+            ) as executor:
+                results = list(executor.map(process_template, *zip(*tasks)))
+        finally:
+            listener.stop()
+    else:
+        results = [process_template(*task) for task in tasks]
+
+    # Failed templates grouped by error signature, each error being logged once
+    errors = {}
+    errorMessages = {}
+
+    for infile, status, message in results:
+        if status == STATUS_DONE:
+            log.info("%s: %s" % (os.path.split(infile)[1], message))
+        elif status == STATUS_SKIPPED:
+            log.warning(message)
+        else:
+            signature, details = message
+            errors.setdefault(signature, []).append(infile)
+
+            if details is not None:
+                errorMessages.setdefault(signature, details)
+
+    for signature, failedFiles in errors.items():
+        log.error(
+            "%s\nThis error occurred for %d template(s): %s"
+            % (errorMessages[signature], len(failedFiles), ", ".join(failedFiles))
+        )
 
 
 if __name__ == "__main__":
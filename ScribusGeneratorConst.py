@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+=================
+Automatic document generation for Scribus.
+=================
+
+This fork based on the great job of Ekkehard Will and Berteh!
+https://github.com/codfish-zz/ScribusGenerator
+
+Major changes in this fork
+# v4.2 (2024-12-19): Support JPG generating with xvfb-run in command line. 
+# v4.1 (2024-12-17): Support PDF generating with xvfb-run in command line. 
+
+For further information (manual, description, etc.) please visit:
+http://berteh.github.io/ScribusGenerator/
+
+# v4.0 (2024-04-17): various bug fix, python3 branch made maste,  MacOS compatible GUI
+# v3.0 (2022-01-12): port to Python3 for Scribut 1.5.6+, some features (count, fill)
+# v2.0 (2015-12-02): added features (merge, range, clean, save/load)
+# v1.9 (2015-08-03): initial command-line support (SLA only, use GUI version to generate PDF)
+
+
+This script holds the ScribusGenerator constants, kept apart from the Engine
+so they can be imported without loading it (eg. for command line defaults)
+
+=================
+The MIT License
+=================
+
+Copyright (c) 2010-2014 Ekkehard Will (www.ekkehardwill.de), 2014-2024 Berteh (https://github.com/berteh/)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions: The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+
+
+class CONST:
+    # Constants for general usage
+    TRUE = 1
+    FALSE = 0
+    EMPTY = ""
+
+    APP_NAME = "Scribus Generator"
+    APP_VERSION = "4.2.0"
+
+    FORMAT_SLA = "Scribus"
+    FORMAT_JPG = "JPG"
+    FORMAT_PDF = "PDF"
+    FORMAT_ALL = "ALL"
+
+    IMG_QUALITY = 60
+
+    FILE_EXTENSION_SCRIBUS = "sla"
+    FILE_EXTENSION_JPG = "jpg"
+    FILE_EXTENSION_PDF = "pdf"
+
+    # In any case we use '/' as path separator on any platform
+    SEP_PATH = "/"
+    SEP_EXT = os.extsep
+
+    # CSV entry separator, comma by default; tab: " " is also common if using Excel.
+    CSV_SEP = ","
+    CSV_ENCODING = "utf-8"
+
+    # Indent the generated SLA code for more readability, aka "XML pretty print".
+    # Set to 1 if you want to edit generated SLA manually.
+    INDENT_SLA = 1
+    CONTRIB_TEXT = "\nPowered by ScribusGenerator - https://github.com/codfish-zz/ScribusGenerator/"
+
+    STORAGE_NAME = "ScribusGeneratorDefaultSettings"
+
+    # Set to 0 to prevent removal of un-subsituted variables, along with their empty containing itext
+    CLEAN_UNUSED_EMPTY_VARS = 1
+
+    # Set to 0 to keep the separating element before an unused/empty variable,
+    # typically a linefeed (<para>) or list syntax token (,;-.)
+    REMOVE_CLEANED_ELEMENT_PREFIX = 1
+
+    # Set to 0 to replace all tabs and linebreaks in csv data by simple spaces.
+    KEEP_TAB_LINEBREAK = 1
+
+    # Set to any word you'd like to use to trigger a jump to the next data record.
+    # Using a name similar to the variables %VAR_ ... % will ensure it is cleaned after generation,
+    # and not show in the final document(s).
+    NEXT_RECORD = "%SG_NEXT-RECORD%"
+    OUTPUTCOUNT_VAR = "COUNT"
+
+    # Number of threads writing SLA files in the background, when asynchronous writes are enabled,
+    # and maximum number of files waiting to be written (each is kept in memory until written).
+    ASYNC_WRITE_WORKERS = 4
+    ASYNC_WRITE_PENDING = 64
+
+    # Set to the minimum amount of numbers you want to force in the output files name counter.
+    # 3 leads to 001,002,...; default is 1.
+    OUTPUTCOUNT_FILL = 1